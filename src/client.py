@@ -2,13 +2,20 @@
 
 import asyncio
 import os
+import sys
 
 from agent_framework import ChatAgent
 from agent_framework_ag_ui import AGUIChatClient
 from dotenv import load_dotenv
+from console import ainput
 
 load_dotenv()
 
+CYAN = "\033[96m"
+RESET = "\033[0m"
+FLUSH_EVERY = 8  # Flush stdout after this many streamed tokens
+
+
 async def main():
     """Main client loop."""
     # Get server URL from environment or use default
@@ -31,7 +38,7 @@ async def main():
     try:
         while True:
             # Get user input
-            message = input("\nUser (:q or quit to exit): ")
+            message = await ainput("\nUser (:q or quit to exit): ")
             if not message.strip():
                 print("Request cannot be empty.")
                 continue
@@ -41,18 +48,30 @@ async def main():
 
             # Stream the agent response
             print("\nAssistant: ", end="", flush=True)
+            tokens = 0
             async for update in agent.run_stream(message, thread=thread):
                 # Print text content as it streams
-                if update.text:
-                    print(f"\033[96m{update.text}\033[0m", end="", flush=True)
+                text = update.text
+                if text:
+                    sys.stdout.write(CYAN + text + RESET)
+                    tokens += 1
+                    if tokens % FLUSH_EVERY == 0 or "\n" in text:
+                        sys.stdout.flush()
 
+            sys.stdout.flush()
             print("\n")
 
-    except KeyboardInterrupt:
+    # asyncio.run turns Ctrl-C into cancellation of main()
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n\nExiting...")
     except Exception as e:
         print(f"\n\033[91mAn error occurred: {e}\033[0m")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
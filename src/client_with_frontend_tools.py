@@ -1,18 +1,35 @@
 """AG-UI client with frontend tools."""
 
 import asyncio
+import functools
+import inspect
 import json
+import logging
 import os
-from typing import Annotated, AsyncIterator
+import sys
+from typing import Annotated, AsyncIterator, get_args, get_origin, get_type_hints
 
 import httpx
+import orjson
 from pydantic import BaseModel, Field
+from pydantic.fields import FieldInfo
 from dotenv import load_dotenv
+from console import ainput
 
 
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+CYAN = "\033[96m"
+RESET = "\033[0m"
+FLUSH_EVERY = 8  # Flush stdout after this many streamed tokens
+
+# Request bodies are encoded with orjson, so the content type is set explicitly
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_STREAM_HEADERS = {**_JSON_HEADERS, "Accept": "text/event-stream"}
+
 
 class SensorReading(BaseModel):
     """Sensor reading from client device."""
@@ -52,6 +69,184 @@ FRONTEND_TOOLS = {
 }
 
 
+# JSON schema types for the parameter annotations used by frontend tools
+_JSON_SCHEMA_TYPES = {
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    str: "string",
+    list: "array",
+    dict: "object",
+}
+
+
+def _parameters_schema(func) -> dict:
+    """Derive a JSON schema for a tool's parameters from its signature.
+
+    Parameters annotated with anything other than a plain scalar, list or dict
+    (e.g. Optional, unions or models) are declared without a "type". Callables
+    whose signature or type hints cannot be resolved, such as functools.partial
+    objects or unresolvable forward references, get the generic object schema.
+    """
+    try:
+        hints = get_type_hints(func, include_extras=True)
+        parameters = inspect.signature(func).parameters
+    except (TypeError, NameError, ValueError):
+        return {"type": "object", "properties": {}}
+
+    properties = {}
+    required = []
+
+    for name, param in parameters.items():
+        hint = hints.get(name, param.annotation)
+        prop = {}
+        description = None
+
+        # Annotated[T, Field(description=...)] carries the parameter description
+        if get_origin(hint) is Annotated:
+            hint, *metadata = get_args(hint)
+            for meta in metadata:
+                if isinstance(meta, FieldInfo) and meta.description:
+                    description = meta.description
+
+        # list[int] and dict[str, Any] map to their bare container types
+        json_type = _JSON_SCHEMA_TYPES.get(get_origin(hint) or hint)
+        if json_type:
+            prop["type"] = json_type
+        if description:
+            prop["description"] = description
+
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+        else:
+            prop["default"] = param.default
+
+        properties[name] = prop
+
+    return {"type": "object", "properties": properties, "required": required}
+
+
+@functools.cache
+def _tool_declaration(name: str, func) -> dict:
+    """Build the server declaration for one tool, cached per (name, function)."""
+    return {
+        "name": name,
+        "description": func.__doc__ or "",
+        "parameters": _parameters_schema(func),
+    }
+
+
+def _build_tool_declarations(tools: dict) -> list[dict]:
+    """Prepare tool declarations for the server with proper parameter schemas."""
+    return [_tool_declaration(name, func) for name, func in tools.items()]
+
+
+def _sse_frame_data(frame: bytearray) -> bytearray | None:
+    """Return the `data:` payload of one SSE frame, or None if it has none."""
+    if b"\n" not in frame:
+        return frame[6:] if frame.startswith(b"data: ") else None
+    # Multi-line frame: join its data fields as the SSE spec requires
+    data = [line[6:] for line in frame.split(b"\n") if line.startswith(b"data: ")]
+    return b"\n".join(data) if data else None
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[bytearray]:
+    """Yield the raw `data:` payload of each SSE frame in a response body.
+
+    AG-UI sends one `data:` line per blank-line terminated frame. Bytes are
+    accumulated in a bytearray and only the newly received part is searched
+    for the last frame boundary, so a frame spanning many chunks is scanned
+    once. All complete frames before that boundary are split in one pass.
+    CRLF and CR line endings are normalized to LF first so frames are always
+    separated by a blank line.
+    """
+    buf = bytearray()
+    carry = b""
+    async for chunk in response.aiter_bytes():
+        if carry:
+            chunk = carry + chunk
+            carry = b""
+        # LF-only streams skip normalization and its copies entirely
+        if b"\r" in chunk:
+            # A CR at the end of a chunk may be the first half of a CRLF pair
+            if chunk.endswith(b"\r"):
+                chunk, carry = chunk[:-1], b"\r"
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        # Resume one byte back so a boundary straddling two chunks is found
+        start = max(len(buf) - 1, 0)
+        buf += chunk
+        end = buf.rfind(b"\n\n", start)
+        if end == -1:
+            continue
+
+        frames = buf[:end].split(b"\n\n")
+        del buf[:end + 2]
+        for frame in frames:
+            if (data := _sse_frame_data(frame)) is not None:
+                yield data
+
+    # The stream may end without the blank line after its last frame
+    if (data := _sse_frame_data(buf.strip(b"\n"))) is not None:
+        yield data
+
+
+def _on_tool_call_start(event: dict, pending_tool_calls: dict[str, dict]) -> None:
+    """TOOL_CALL_START: create chunk list for args."""
+    pending_tool_calls[event.get("toolCallId")] = {
+        "name": event.get("toolCallName"),
+        "chunks": [],
+    }
+
+
+def _on_tool_call_args(event: dict, pending_tool_calls: dict[str, dict]) -> None:
+    """TOOL_CALL_ARGS: append delta fragments."""
+    tcid = event.get("toolCallId")
+    delta = event.get("delta", "")
+    info = pending_tool_calls.get(tcid)
+    if info is not None:
+        info["chunks"].append(delta)
+    else:
+        # If we haven't seen a start, create an entry conservatively
+        pending_tool_calls[tcid] = {"name": event.get("toolCallName"), "chunks": [delta]}
+
+
+def _on_tool_call_end(event: dict, pending_tool_calls: dict[str, dict]) -> dict:
+    """TOOL_CALL_END: parse accumulated args and build the handler event."""
+    tcid = event.get("toolCallId")
+    info = pending_tool_calls.pop(tcid, None)
+    args = {}
+    # Join fragments once here instead of concatenating per delta
+    buf = "".join(info["chunks"]) if info else ""
+    # Only attempt a parse when the payload looks complete
+    stripped = buf.rstrip()
+    if stripped and stripped[-1] in "}]":
+        try:
+            args = orjson.loads(buf)
+        except Exception:
+            # best-effort fallback: try replacing single quotes
+            try:
+                args = json.loads(buf.replace("'", '"'))
+            except Exception:
+                args = {}
+
+    # Build a consolidated event for the handler
+    return {
+        "toolCallName": (info.get("name") if info else event.get("toolCallName")),
+        "toolCallId": tcid,
+        "arguments": args,
+    }
+
+
+# Tool-call events are dispatched by type; a handler returning a dict
+# means a complete tool call is ready to execute
+_TOOL_EVENT_HANDLERS = {
+    "TOOL_CALL_START": _on_tool_call_start,
+    "TOOL_CALL_ARGS": _on_tool_call_args,
+    "TOOL_CALL_END": _on_tool_call_end,
+}
+
+
 class AGUIClientWithTools:
     """AG-UI client with frontend tool support."""
 
@@ -59,130 +254,94 @@ class AGUIClientWithTools:
         self.server_url = server_url
         self.tools = tools
         self.thread_id: str | None = None
+        self._tool_result_url = f"{server_url}/tool_result"
+        # Tool declarations only depend on self.tools, so build them once
+        self._tool_declarations = _build_tool_declarations(tools)
+        # The system message and tools never change, so their JSON is encoded
+        # once and only the user message and thread_id are encoded per request
+        self._system_msg = {"role": "system", "content": "You are a helpful assistant with access to client tools."}
+        self._body_prefix = b'{"messages":[' + orjson.dumps(self._system_msg) + b","
+        self._body_tools = b'],"tools":' + orjson.dumps(self._tool_declarations)
+        # Long-lived HTTP client so connections are pooled across messages
+        self._client = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+
+    async def __aenter__(self) -> "AGUIClientWithTools":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
 
     async def send_message(self, message: str) -> AsyncIterator[dict]:
         """Send a message and handle streaming response with tool execution."""
-        # Prepare tool declarations for the server with proper parameter schemas
-        tool_declarations = []
-        
-        # Define parameter schemas for each tool
-        tool_schemas = {
-            "read_climate_sensors": {
-                "type": "object",
-                "properties": {
-                    "include_temperature": {
-                        "type": "boolean",
-                        "description": "Include temperature",
-                        "default": True,
-                    },
-                    "include_humidity": {
-                        "type": "boolean",
-                        "description": "Include humidity",
-                        "default": True,
-                    },
-                },
-                "required": [],  # Both parameters have defaults
-            },
-            "get_user_location": {
-                "type": "object",
-                "properties": {},  # No parameters
-                "required": [],
-            },
-        }
-        
-        for name, func in self.tools.items():
-            parameters_schema = tool_schemas.get(name, {"type": "object", "properties": {}})
-            
-            tool_declarations.append({
-                "name": name,
-                "description": func.__doc__ or "",
-                "parameters": parameters_schema,
-            })
-
-        request_data = {
-            "messages": [
-                {"role": "system", "content": "You are a helpful assistant with access to client tools."},
-                {"role": "user", "content": message},
-            ],
-            "tools": tool_declarations,  # Send tool declarations to server
-        }
-
+        # Splice the user message (and thread_id) into the pre-encoded body
+        body = self._body_prefix + orjson.dumps({"role": "user", "content": message}) + self._body_tools
         if self.thread_id:
-            request_data["thread_id"] = self.thread_id
-
-        print('Payload sent to server:', json.dumps(request_data, indent=2))
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream(
-                "POST",
-                self.server_url,
-                json=request_data,
-                headers={"Accept": "text/event-stream"},
-            ) as response:
-                response.raise_for_status()
-
-                # Map of pending tool calls: toolCallId -> {name, buffer}
-                pending_tool_calls: dict[str, dict] = {}
-
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        try:
-                            event = json.loads(data)
-
-                            ev_type = event.get("type")
-
-                            # TOOL_CALL_START: create buffer for args
-                            if ev_type == "TOOL_CALL_START":
-                                tcid = event.get("toolCallId")
-                                pending_tool_calls[tcid] = {
-                                    "name": event.get("toolCallName"),
-                                    "buffer": "",
-                                }
-
-                            # TOOL_CALL_ARGS: append delta fragments
-                            elif ev_type == "TOOL_CALL_ARGS":
-                                tcid = event.get("toolCallId")
-                                delta = event.get("delta", "")
-                                if tcid in pending_tool_calls:
-                                    pending_tool_calls[tcid]["buffer"] += delta
-                                else:
-                                    # If we haven't seen a start, create an entry conservatively
-                                    pending_tool_calls[tcid] = {"name": event.get("toolCallName"), "buffer": delta}
-
-                            # TOOL_CALL_END: parse accumulated args and invoke handler
-                            elif ev_type == "TOOL_CALL_END":
-                                tcid = event.get("toolCallId")
-                                info = pending_tool_calls.pop(tcid, None)
-                                args = {}
-                                if info and info.get("buffer"):
-                                    buf = info["buffer"]
-                                    try:
-                                        args = json.loads(buf)
-                                    except Exception:
-                                        # best-effort fallback: try replacing single quotes
-                                        try:
-                                            args = json.loads(buf.replace("'", '"'))
-                                        except Exception:
-                                            args = {}
-
-                                # Build a consolidated event for the handler
-                                handler_event = {
-                                    "toolCallName": (info.get("name") if info else event.get("toolCallName")),
-                                    "toolCallId": tcid,
-                                    "arguments": args,
-                                }
-                                await self._handle_tool_call(handler_event, client)
-
-                            else:
-                                # Non-tool events are yielded to the caller
-                                # Capture thread_id if present
-                                if ev_type == "RUN_STARTED" and not self.thread_id:
-                                    self.thread_id = event.get("threadId")
-                                yield event
-
-                        except json.JSONDecodeError:
-                            continue
+            body += b',"thread_id":' + orjson.dumps(self.thread_id)
+        body += b"}"
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Payload sent to server: %s", body.decode())
+
+        client = self._client
+        async with client.stream(
+            "POST",
+            self.server_url,
+            content=body,
+            headers=_STREAM_HEADERS,
+        ) as response:
+            response.raise_for_status()
+
+            # Map of pending tool calls: toolCallId -> {name, chunks}
+            pending_tool_calls: dict[str, dict] = {}
+
+            # Tool handlers run as tasks so their POSTs overlap with reading the stream
+            pending_tasks: list[asyncio.Task] = []
+            tool_errors: list[Exception] = []
+
+            # Bind hot lookups to locals for the per-event loop
+            loads = orjson.loads
+            get_handler = _TOOL_EVENT_HANDLERS.get
+
+            try:
+                async for data in _iter_sse_data(response):
+                    try:
+                        event = loads(data)
+                    except orjson.JSONDecodeError:
+                        continue
+
+                    ev_type = event.get("type")
+                    handler = get_handler(ev_type)
+
+                    if handler is None:
+                        # Non-tool events are yielded to the caller
+                        # Capture thread_id if present
+                        if ev_type == "RUN_STARTED" and not self.thread_id:
+                            self.thread_id = event.get("threadId")
+                        yield event
+                        continue
+
+                    handler_event = handler(event, pending_tool_calls)
+                    if handler_event is not None:
+                        pending_tasks.append(
+                            asyncio.create_task(self._handle_tool_call(handler_event, client))
+                        )
+            finally:
+                if pending_tasks:
+                    results = await asyncio.gather(*pending_tasks, return_exceptions=True)
+                    tool_errors = [r for r in results if isinstance(r, Exception)]
+
+            # Surface the first handler failure to the caller once the stream is done
+            if tool_errors:
+                for error in tool_errors[1:]:
+                    logger.debug("Additional tool call handler failure", exc_info=error)
+                raise tool_errors[0]
 
     async def _handle_tool_call(self, event: dict, client: httpx.AsyncClient):
         """Execute frontend tool and send result back to server."""
@@ -209,22 +368,24 @@ class AGUIClientWithTools:
 
             # Send result back to server
             await client.post(
-                f"{self.server_url}/tool_result",
-                json={
+                self._tool_result_url,
+                content=orjson.dumps({
                     "tool_call_id": tool_call_id,
                     "result": result,
-                },
+                }),
+                headers=_JSON_HEADERS,
             )
 
         except Exception as e:
             print(f"\033[91m[Tool Error: {e}]\033[0m")
             # Send error back to server
             await client.post(
-                f"{self.server_url}/tool_result",
-                json={
+                self._tool_result_url,
+                content=orjson.dumps({
                     "tool_call_id": tool_call_id,
                     "error": str(e),
-                },
+                }),
+                headers=_JSON_HEADERS,
             )
 
 
@@ -233,41 +394,56 @@ async def main():
     server_url = os.environ.get("AGUI_SERVER_URL", "http://127.0.0.1:8888/")
     print(f"Connecting to AG-UI server at: {server_url}\n")
 
-    client = AGUIClientWithTools(server_url, FRONTEND_TOOLS)
-
-    try:
-        while True:
-            message = input("\nUser (:q or quit to exit): ")
-            if not message.strip():
-                continue
-
-            if message.lower() in (":q", "quit"):
-                break
-
-            print()
-            async for event in client.send_message(message):
-                event_type = event.get("type", "")
-
-                if event_type == "RUN_STARTED":
-                    print(f"\033[93m[Run Started]\033[0m")
-
-                elif event_type == "TEXT_MESSAGE_CONTENT":
-                    print(f"\033[96m{event.get('delta', '')}\033[0m", end="", flush=True)
-
-                elif event_type == "RUN_FINISHED":
-                    print(f"\n\033[92m[Run Finished]\033[0m")
-
-                elif event_type == "RUN_ERROR":
-                    error_msg = event.get("message", "Unknown error")
-                    print(f"\n\033[91m[Error: {error_msg}]\033[0m")
-
-            print()
-
-    except KeyboardInterrupt:
-        print("\n\nExiting...")
-    except Exception as e:
-        print(f"\n\033[91mError: {e}\033[0m")
+    async with AGUIClientWithTools(server_url, FRONTEND_TOOLS) as client:
+        try:
+            while True:
+                message = await ainput("\nUser (:q or quit to exit): ")
+                if not message.strip():
+                    continue
+
+                if message.lower() in (":q", "quit"):
+                    break
+
+                print()
+                tokens = 0
+                write = sys.stdout.write
+                async for event in client.send_message(message):
+                    event_type = event.get("type", "")
+
+                    if event_type == "RUN_STARTED":
+                        print(f"\033[93m[Run Started]\033[0m")
+
+                    elif event_type == "TEXT_MESSAGE_CONTENT":
+                        delta = event.get("delta")
+                        if delta:
+                            write(CYAN)
+                            write(delta)
+                            write(RESET)
+                            tokens += 1
+                            if tokens % FLUSH_EVERY == 0 or "\n" in delta:
+                                sys.stdout.flush()
+
+                    elif event_type == "RUN_FINISHED":
+                        print(f"\n\033[92m[Run Finished]\033[0m", flush=True)
+
+                    elif event_type == "RUN_ERROR":
+                        error_msg = event.get("message", "Unknown error")
+                        print(f"\n\033[91m[Error: {error_msg}]\033[0m")
+
+                sys.stdout.flush()
+                print()
+
+        # asyncio.run turns Ctrl-C into cancellation of main()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            print("\n\nExiting...")
+        except Exception as e:
+            print(f"\n\033[91mError: {e}\033[0m")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
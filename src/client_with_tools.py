@@ -2,12 +2,18 @@
 
 import asyncio
 import os
+import sys
 
 from agent_framework import ChatAgent, FunctionCallContent, FunctionResultContent
 from agent_framework_ag_ui import AGUIChatClient
 from dotenv import load_dotenv
+from console import ainput
 load_dotenv()
 
+CYAN = "\033[96m"
+RESET = "\033[0m"
+FLUSH_EVERY = 8  # Flush stdout after this many streamed tokens
+
 
 async def main():
     """Main client loop with tool event display."""
@@ -29,7 +35,7 @@ async def main():
 
     try:
         while True:
-            message = input("\nUser (:q or quit to exit): ")
+            message = await ainput("\nUser (:q or quit to exit): ")
             if not message.strip():
                 continue
 
@@ -37,10 +43,15 @@ async def main():
                 break
 
             print("\nAssistant: ", end="", flush=True)
+            tokens = 0
             async for update in agent.run_stream(message, thread=thread):
                 # Display text content
-                if update.text:
-                    print(f"\033[96m{update.text}\033[0m", end="", flush=True)
+                text = update.text
+                if text:
+                    sys.stdout.write(CYAN + text + RESET)
+                    tokens += 1
+                    if tokens % FLUSH_EVERY == 0 or "\n" in text:
+                        sys.stdout.flush()
 
                 # Display tool calls and results
                 for content in update.contents:
@@ -52,13 +63,20 @@ async def main():
                         result_text = content.result if isinstance(content.result, str) else str(content.result)
                         print(f"\033[94m[Tool result: {result_text}]\033[0m")
 
+            sys.stdout.flush()
             print("\n")
 
-    except KeyboardInterrupt:
+    # asyncio.run turns Ctrl-C into cancellation of main()
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n\nExiting...")
     except Exception as e:
         print(f"\n\033[91mError: {e}\033[0m")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
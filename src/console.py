@@ -0,0 +1,30 @@
+"""Console helpers shared by the AG-UI client examples."""
+
+import asyncio
+import threading
+
+
+async def ainput(prompt: str) -> str:
+    """Read a line from stdin without blocking the event loop.
+
+    input() runs on a daemon thread rather than the default executor, whose
+    shutdown would otherwise wait on the pending read after Ctrl-C.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(setter, value) -> None:
+        # The awaiting task may already have been cancelled by Ctrl-C
+        if not future.cancelled():
+            setter(value)
+
+    def read() -> None:
+        try:
+            line = input(prompt)
+        except Exception as e:
+            loop.call_soon_threadsafe(resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, line)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
@@ -0,0 +1,157 @@
+"""Tests for the SSE parsing and tool-call handling in the frontend-tools client."""
+
+import asyncio
+import logging
+from pathlib import Path
+
+import httpx
+import orjson
+import pytest
+
+from client_with_frontend_tools import (
+    FRONTEND_TOOLS,
+    AGUIClientWithTools,
+    _build_tool_declarations,
+    _iter_sse_data,
+    _on_tool_call_args,
+    _on_tool_call_end,
+    _on_tool_call_start,
+)
+
+RECORDED_STREAM = (Path(__file__).parent / "response v2.txt").read_bytes()
+
+
+class FakeResponse:
+    """Minimal stand-in for httpx.Response that streams fixed-size chunks."""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def aiter_bytes(self):
+        for i in range(0, len(self.body), self.chunk_size):
+            yield self.body[i:i + self.chunk_size]
+
+
+def collect(body: bytes, chunk_size: int) -> list[bytes]:
+    async def run():
+        return [data async for data in _iter_sse_data(FakeResponse(body, chunk_size))]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("newline", [b"\n", b"\r\n"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 4096, len(RECORDED_STREAM)])
+def test_recorded_stream(newline, chunk_size):
+    body = RECORDED_STREAM.replace(b"\n", newline)
+    events = [orjson.loads(data) for data in collect(body, chunk_size)]
+
+    assert len(events) == 16
+    assert events[0]["type"] == "RUN_STARTED"
+    assert events[-1]["type"] == "RUN_FINISHED"
+    args = "".join(e["delta"] for e in events if e["type"] == "TOOL_CALL_ARGS")
+    assert orjson.loads(args) == {"include_temperature": True, "include_humidity": False}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_multiline_comment_and_unterminated_frames(chunk_size):
+    body = b"data: a\n\ndata: b\ndata: c\n\n: comment\n\ndata: d"
+    assert collect(body, chunk_size) == [b"a", b"b\nc", b"d"]
+
+
+def assemble_tool_call(deltas: list[str]) -> dict:
+    pending: dict[str, dict] = {}
+    _on_tool_call_start({"toolCallId": "t1", "toolCallName": "tool"}, pending)
+    for delta in deltas:
+        _on_tool_call_args({"toolCallId": "t1", "delta": delta}, pending)
+    handler_event = _on_tool_call_end({"toolCallId": "t1"}, pending)
+    assert pending == {}
+    return handler_event
+
+
+@pytest.mark.parametrize(
+    "deltas, expected",
+    [
+        (['{"a"', ": 1", ', "b": [true]}'], {"a": 1, "b": [True]}),
+        (["{'a': 1}"], {"a": 1}),  # single-quote repair fallback
+        (['{"a": 1'], {}),  # unterminated payload is not parsed
+        (["{not json}"], {}),
+        ([], {}),
+    ],
+)
+def test_tool_call_args_assembly(deltas, expected):
+    event = assemble_tool_call(deltas)
+    assert event == {"toolCallName": "tool", "toolCallId": "t1", "arguments": expected}
+
+
+def test_tool_call_args_without_start():
+    pending: dict[str, dict] = {}
+    _on_tool_call_args({"toolCallId": "t1", "toolCallName": "tool", "delta": '{"a": 1}'}, pending)
+    event = _on_tool_call_end({"toolCallId": "t1"}, pending)
+    assert event == {"toolCallName": "tool", "toolCallId": "t1", "arguments": {"a": 1}}
+
+
+def run_client(tools: dict, messages: list[str], fail_tool_result: bool = False):
+    """Send messages through a client whose server replays the recorded stream."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/tool_result"):
+            if fail_tool_result:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200)
+        return httpx.Response(200, content=RECORDED_STREAM)
+
+    async def run():
+        client = AGUIClientWithTools("http://test/", tools)
+        await client._client.aclose()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with client:
+            return [[event async for event in client.send_message(m)] for m in messages]
+
+    return asyncio.run(run()), requests
+
+
+def test_request_body_with_and_without_thread_id():
+    _, requests = run_client(FRONTEND_TOOLS, ["hello", 'say "hi"'])
+    first, _, second, _ = requests
+    expected = {
+        "messages": [
+            {"role": "system", "content": "You are a helpful assistant with access to client tools."},
+            {"role": "user", "content": "hello"},
+        ],
+        "tools": _build_tool_declarations(FRONTEND_TOOLS),
+    }
+
+    assert first.headers["content-type"] == "application/json"
+    assert orjson.loads(first.content) == expected
+
+    # The thread id from RUN_STARTED is sent with the next message
+    expected["messages"][1]["content"] = 'say "hi"'
+    expected["thread_id"] = "bb61af57-6037-419d-a832-56a3fb71105e"
+    assert orjson.loads(second.content) == expected
+
+
+def test_tool_call_executed_with_assembled_args():
+    calls = []
+
+    def read_climate_sensors(**kwargs):
+        calls.append(kwargs)
+        return {"ok": True}
+
+    responses, requests = run_client({"read_climate_sensors": read_climate_sensors}, ["hi"])
+
+    assert calls == [{"include_temperature": True, "include_humidity": False}]
+    assert [event["type"] for event in responses[0]] == ["RUN_STARTED", "RUN_FINISHED"]
+    assert orjson.loads(requests[1].content) == {
+        "tool_call_id": "call_WKo5cMhTIu3rIRKhT0UKlBxD",
+        "result": {"ok": True},
+    }
+
+
+def test_tool_call_failure_raised_after_stream(caplog):
+    with pytest.raises(httpx.ConnectError):
+        run_client(FRONTEND_TOOLS, ["hi"], fail_tool_result=True)
+    # Reported once, by the caller, not also through logging
+    assert not [r for r in caplog.records if r.levelno >= logging.WARNING]